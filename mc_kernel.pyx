@@ -0,0 +1,69 @@
+# cython: language_level=3, boundscheck=False, wraparound=False, cdivision=True
+"""
+Optional compiled Monte Carlo kernel for test_win_probability.py.
+
+Used by mc_counts when Numba is not installed. Build in place with:
+
+    pip install cython
+    cythonize -i mc_kernel.pyx
+"""
+from libc.math cimport exp, fabs, log
+from libc.stdint cimport uint64_t
+
+import numpy as np
+
+# Same model constants as test_win_probability.py (sosCalculator.js)
+cdef double _ALPHA = log(10.0) / 400.0
+cdef double _DRAW_BASE = 0.27
+cdef double _DRAW_SLOPE = 0.0004
+cdef double _DRAW_FLOOR = 0.15
+
+
+cdef inline uint64_t _splitmix64(uint64_t *state) nogil:
+    """Advance the SplitMix64 state and return the next 64-bit output."""
+    state[0] += <uint64_t>0x9E3779B97F4A7C15
+    cdef uint64_t z = state[0]
+    z = (z ^ (z >> 30)) * <uint64_t>0xBF58476D1CE4E5B9
+    z = (z ^ (z >> 27)) * <uint64_t>0x94D049BB133111EB
+    return z ^ (z >> 31)
+
+
+cdef inline double _random(uint64_t *state) nogil:
+    """Uniform double in [0, 1) from the top 53 bits."""
+    return (_splitmix64(state) >> 11) * (1.0 / 9007199254740992.0)
+
+
+def mc_counts(const double[:] team_elos, const double[:] opp_elos, long n, uint64_t seed):
+    """
+    Simulate n matches for each (team_elos[k], opp_elos[k]) pairing and
+    return a (k, 3) int64 array of (wins, draws, losses) counts for the team.
+    """
+    cdef Py_ssize_t n_cases = team_elos.shape[0]
+    counts = np.zeros((n_cases, 3), dtype=np.int64)
+    cdef long long[:, :] out = counts
+    cdef uint64_t state = seed
+    cdef Py_ssize_t k
+    cdef long i, wins, draws
+    cdef double diff, draw, win, win_or_draw, rand
+
+    with nogil:
+        for k in range(n_cases):
+            diff = team_elos[k] - opp_elos[k]
+            draw = _DRAW_BASE - fabs(diff) * _DRAW_SLOPE
+            if draw < _DRAW_FLOOR:
+                draw = _DRAW_FLOOR
+            win = (1.0 - draw) / (1.0 + exp(-diff * _ALPHA))
+            win_or_draw = win + draw
+
+            wins = 0
+            draws = 0
+            for i in range(n):
+                rand = _random(&state)
+                if rand < win:
+                    wins += 1
+                elif rand < win_or_draw:
+                    draws += 1
+            out[k, 0] = wins
+            out[k, 1] = draws
+            out[k, 2] = n - wins - draws
+    return counts
@@ -9,15 +9,48 @@ This script tests the live server's win probability calculations by:
 4. Running Monte Carlo simulations to validate theoretical values
 """
 
+import gzip
+import http.client
 import json
 import math
-import random
-import urllib.request
-from typing import Dict, List, Tuple
+import urllib.parse
+from typing import Callable, Dict, List, NamedTuple, Tuple, Union
 from dataclasses import dataclass
 
+import numpy as np
+
+try:
+    from numba import njit, prange
+except ImportError:
+    njit = None
+
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:
+    _json_loads = json.loads
+
 SERVER_URL = "http://localhost:3000"
 MC_ITERATIONS = 50000  # Match server's iteration count
+MC_BATCH_SIZE = 10000  # Iterations drawn per rng.random() call in the NumPy kernel
+MC_PARALLEL_CHUNK = 2000  # Iterations per independently seeded chunk in the numba kernel
+MC_SEED = 0xC0FFEE  # Fixed so local Monte Carlo runs are reproducible
+
+# Process-wide generator used when a caller does not pass its own
+RNG = np.random.default_rng(MC_SEED)
+
+# 10^(x / 400) == exp(x * _ALPHA); exp is cheaper than a general pow
+_ALPHA = math.log(10) / 400
+
+# Draw model (sosCalculator.js): max(_DRAW_FLOOR, _DRAW_BASE - |diff| * _DRAW_SLOPE)
+_DRAW_BASE = 0.27
+_DRAW_SLOPE = 0.0004
+_DRAW_FLOOR = 0.15
+
+# Match outcome codes (0 = home win, 1 = draw, 2 = away win) -> points awarded.
+# The away side's W/D/L column for outcome code c is simply 2 - c.
+_POINTS_A = np.array([3, 1, 0], dtype=np.int8)
+_POINTS_B = np.array([0, 1, 3], dtype=np.int8)
 
 
 # =============================================================================
@@ -26,141 +59,362 @@ MC_ITERATIONS = 50000  # Match server's iteration count
 
 def elo_win_probability(rating1: float, rating2: float) -> float:
     """Standard Elo win probability: P = 1 / (1 + 10^((Elo2 - Elo1) / 400))"""
-    return 1 / (1 + math.pow(10, (rating2 - rating1) / 400))
+    return 1 / (1 + math.exp((rating2 - rating1) * _ALPHA))
+
+
+def elo_win_probability_vec(ratings1, ratings2) -> np.ndarray:
+    """Vectorized elo_win_probability, broadcast over the inputs."""
+    return 1 / (1 + np.exp((np.asarray(ratings2) - np.asarray(ratings1)) * _ALPHA))
+
+
+class Probs(NamedTuple):
+    """Outcome probabilities for one match, from the first team's side."""
+    win: float
+    draw: float
+    loss: float
+    win_expectancy: float  # Raw Elo value before draw adjustment
 
 
-def get_match_probabilities(team_elo: float, opp_elo: float) -> Dict[str, float]:
+def get_match_probabilities(team_elo: float, opp_elo: float) -> Probs:
     """Three-outcome model for group matches (win/draw/loss)."""
-    win_expectancy = 1 / (1 + math.pow(10, (opp_elo - team_elo) / 400))
+    win_expectancy = elo_win_probability(team_elo, opp_elo)
     elo_diff = abs(team_elo - opp_elo)
-    draw_prob = max(0.15, 0.27 - elo_diff * 0.0004)
+    draw_prob = max(_DRAW_FLOOR, _DRAW_BASE - elo_diff * _DRAW_SLOPE)
     win_prob = win_expectancy * (1 - draw_prob)
     loss_prob = (1 - win_expectancy) * (1 - draw_prob)
-    return {'win': win_prob, 'draw': draw_prob, 'loss': loss_prob}
+    return Probs(win_prob, draw_prob, loss_prob, win_expectancy)
 
 
-def simulate_bracket(seeded_elo: float, unseeded_elos: List[float]) -> Dict:
-    """Simulate intercontinental playoff bracket (1 seeded vs 2 unseeded)."""
-    team1_elo, team2_elo = unseeded_elos
-    team1_win_prob = elo_win_probability(team1_elo, team2_elo)
+def get_match_probabilities_vec(team_elos, opp_elos) -> Probs:
+    """Vectorized get_match_probabilities: a Probs of arrays, broadcast over the inputs."""
+    team_elos = np.asarray(team_elos, dtype=np.float64)
+    opp_elos = np.asarray(opp_elos, dtype=np.float64)
+    win_expectancy = elo_win_probability_vec(team_elos, opp_elos)
+    draw_prob = np.maximum(_DRAW_FLOOR, _DRAW_BASE - np.abs(team_elos - opp_elos) * _DRAW_SLOPE)
+    win_prob = win_expectancy * (1 - draw_prob)
+    loss_prob = (1 - win_expectancy) * (1 - draw_prob)
+    return Probs(win_prob, draw_prob, loss_prob, win_expectancy)
+
+
+def simulate_brackets_vec(seeded_elos, unseeded_elos) -> Dict[str, np.ndarray]:
+    """
+    Vectorized simulate_bracket over N intercontinental brackets.
+
+    seeded_elos has shape (N,), unseeded_elos shape (N, 2); every value in the
+    returned dict is an array of length N.
+    """
+    seeded_elo = np.asarray(seeded_elos, dtype=np.float64)
+    unseeded = np.asarray(unseeded_elos, dtype=np.float64)
+    team1_elo, team2_elo = unseeded[:, 0], unseeded[:, 1]
+    team1_win_prob = elo_win_probability_vec(team1_elo, team2_elo)
 
     # Expected Elo of semi-final winner
     semifinal_winner_elo = team1_win_prob * team1_elo + (1 - team1_win_prob) * team2_elo
 
     # Final: seeded vs semi-final winner
-    seeded_win_prob = elo_win_probability(seeded_elo, semifinal_winner_elo)
+    seeded_win_prob = elo_win_probability_vec(seeded_elo, semifinal_winner_elo)
 
     # Expected winner Elo
     expected_winner_elo = seeded_win_prob * seeded_elo + (1 - seeded_win_prob) * semifinal_winner_elo
 
     return {
-        'expected_elo': round(expected_winner_elo),
+        'expected_elo': np.rint(expected_winner_elo).astype(np.int64),
         'seeded_win_prob': seeded_win_prob,
         'unseeded1_win_prob': (1 - seeded_win_prob) * team1_win_prob,
         'unseeded2_win_prob': (1 - seeded_win_prob) * (1 - team1_win_prob)
     }
 
 
-def simulate_uefa_path(team_elos: List[float]) -> Dict:
-    """Simulate UEFA playoff path (4 teams, seeded 1v4 and 2v3)."""
-    sorted_elos = sorted(team_elos, reverse=True)
-    t1, t2, t3, t4 = sorted_elos
+def simulate_bracket(seeded_elo: float, unseeded_elos: List[float]) -> Dict:
+    """Simulate intercontinental playoff bracket (1 seeded vs 2 unseeded)."""
+    sim = simulate_brackets_vec([seeded_elo], [unseeded_elos])
+    return {key: value[0].item() for key, value in sim.items()}
+
+
+def simulate_uefa_paths_vec(team_elos) -> Dict[str, np.ndarray]:
+    """
+    Vectorized simulate_uefa_path over N paths; team_elos has shape (N, 4).
+
+    Returns 'expected_elo' and 'probs_sum' of shape (N,) and 'team_probs' of
+    shape (N, 4), each row sorted from most to least likely winner.
+    """
+    elos = -np.sort(-np.asarray(team_elos, dtype=np.float64), axis=1)
+    t1, t2, t3, t4 = elos.T
+
+    # All pairwise win probabilities in one call: p[n, i, j] = P(team i beats team j)
+    p = elo_win_probability_vec(elos[:, :, np.newaxis], elos[:, np.newaxis, :])
 
     # Semi-finals
-    sf1_t1_win = elo_win_probability(t1, t4)
-    sf2_t2_win = elo_win_probability(t2, t3)
+    sf1_t1_win = p[:, 0, 3]
+    sf2_t2_win = p[:, 1, 2]
 
     # Final probabilities
-    t1_wins = sf1_t1_win * (sf2_t2_win * elo_win_probability(t1, t2) +
-                            (1 - sf2_t2_win) * elo_win_probability(t1, t3))
-    t4_wins = (1 - sf1_t1_win) * (sf2_t2_win * elo_win_probability(t4, t2) +
-                                  (1 - sf2_t2_win) * elo_win_probability(t4, t3))
-    t2_wins = sf2_t2_win * (sf1_t1_win * elo_win_probability(t2, t1) +
-                            (1 - sf1_t1_win) * elo_win_probability(t2, t4))
-    t3_wins = (1 - sf2_t2_win) * (sf1_t1_win * elo_win_probability(t3, t1) +
-                                  (1 - sf1_t1_win) * elo_win_probability(t3, t4))
+    t1_wins = sf1_t1_win * (sf2_t2_win * p[:, 0, 1] + (1 - sf2_t2_win) * p[:, 0, 2])
+    t4_wins = (1 - sf1_t1_win) * (sf2_t2_win * p[:, 3, 1] + (1 - sf2_t2_win) * p[:, 3, 2])
+    t2_wins = sf2_t2_win * (sf1_t1_win * p[:, 1, 0] + (1 - sf1_t1_win) * p[:, 1, 3])
+    t3_wins = (1 - sf2_t2_win) * (sf1_t1_win * p[:, 2, 0] + (1 - sf1_t1_win) * p[:, 2, 3])
 
     expected_elo = t1 * t1_wins + t2 * t2_wins + t3 * t3_wins + t4 * t4_wins
+    team_probs = np.column_stack([t1_wins, t2_wins, t3_wins, t4_wins])
 
     return {
-        'expected_elo': round(expected_elo),
-        'probs_sum': t1_wins + t2_wins + t3_wins + t4_wins,
-        'team_probs': sorted([t1_wins, t2_wins, t3_wins, t4_wins], reverse=True)
+        'expected_elo': np.rint(expected_elo).astype(np.int64),
+        'probs_sum': team_probs.sum(axis=1),
+        'team_probs': -np.sort(-team_probs, axis=1)
     }
 
 
-def simulate_group_monte_carlo(team_elos: List[Tuple[str, float]], iterations: int = MC_ITERATIONS) -> Dict:
-    """Run Monte Carlo simulation for a 4-team group."""
-    stats = {code: {'wins': 0, 'draws': 0, 'losses': 0, 'points': 0,
-                    'positions': [0, 0, 0, 0]} for code, _ in team_elos}
-
-    # Generate match pairings (6 matches in 4-team group)
-    matches = []
-    for i in range(len(team_elos)):
-        for j in range(i + 1, len(team_elos)):
-            matches.append((team_elos[i], team_elos[j]))
-
-    for _ in range(iterations):
-        sim_points = {code: 0 for code, _ in team_elos}
-        sim_wdl = {code: [0, 0, 0] for code, _ in team_elos}  # wins, draws, losses
-
-        for (code_a, elo_a), (code_b, elo_b) in matches:
-            probs = get_match_probabilities(elo_a, elo_b)
-            rand = random.random()
-
-            if rand < probs['win']:
-                sim_points[code_a] += 3
-                sim_wdl[code_a][0] += 1
-                sim_wdl[code_b][2] += 1
-            elif rand < probs['win'] + probs['draw']:
-                sim_points[code_a] += 1
-                sim_points[code_b] += 1
-                sim_wdl[code_a][1] += 1
-                sim_wdl[code_b][1] += 1
-            else:
-                sim_points[code_b] += 3
-                sim_wdl[code_b][0] += 1
-                sim_wdl[code_a][2] += 1
-
-        for code, _ in team_elos:
-            stats[code]['wins'] += sim_wdl[code][0]
-            stats[code]['draws'] += sim_wdl[code][1]
-            stats[code]['losses'] += sim_wdl[code][2]
-            stats[code]['points'] += sim_points[code]
-
-        standings = sorted(team_elos, key=lambda x: sim_points[x[0]], reverse=True)
-        for idx, (code, _) in enumerate(standings):
-            stats[code]['positions'][idx] += 1
+def simulate_uefa_path(team_elos: List[float]) -> Dict:
+    """Simulate UEFA playoff path (4 teams, seeded 1v4 and 2v3)."""
+    sim = simulate_uefa_paths_vec([team_elos])
+    return {
+        'expected_elo': sim['expected_elo'][0].item(),
+        'probs_sum': sim['probs_sum'][0].item(),
+        'team_probs': sim['team_probs'][0].tolist()
+    }
+
+
+if njit is not None:
+    @njit(parallel=True, cache=True, fastmath=True)
+    def _simulate_groups_numba(n, pair_a, pair_b, win_thr, draw_cum_thr, iterations, seeds):
+        """
+        Compiled group Monte Carlo kernel (used when numba is installed).
+
+        Simulates G groups of n teams at once. Matches are given as parallel
+        arrays: match m is team pair_a[m] against team pair_b[m]; in group g
+        a uniform draw below win_thr[g, m] is a home win and below
+        draw_cum_thr[g, m] (win + draw probability) a draw.
+
+        Each group's iterations are split into seeds.shape[1] chunks, and all
+        G * chunks work items run across threads with prange. Each chunk
+        reseeds the generator and tallies into its own slice, so results
+        don't depend on the thread count.
+
+        Returns (positions[G, n, n], wdl_sum[G, n, 3], points_sum[G, n]) where
+        positions[g, i, k] counts how often team i of group g finished in place k.
+        """
+        n_groups = win_thr.shape[0]
+        n_matches = pair_a.shape[0]
+        n_chunks = seeds.shape[1]
+        chunk_size = (iterations + n_chunks - 1) // n_chunks
+        n_items = n_groups * n_chunks
+
+        item_positions = np.zeros((n_items, n, n), dtype=np.int64)
+        item_wdl = np.zeros((n_items, n, 3), dtype=np.int64)
+        item_points = np.zeros((n_items, n), dtype=np.int64)
+
+        for item in prange(n_items):
+            g = item // n_chunks
+            c = item % n_chunks
+            np.random.seed(seeds[g, c])
+            points = np.zeros(n, dtype=np.int64)
+
+            for _ in range(c * chunk_size, min(iterations, (c + 1) * chunk_size)):
+                points[:] = 0
+                for m in range(n_matches):
+                    a = pair_a[m]
+                    b = pair_b[m]
+                    rand = np.random.random()
+
+                    outcome = (rand >= win_thr[g, m]) + (rand >= draw_cum_thr[g, m])
+                    points[a] += _POINTS_A[outcome]
+                    points[b] += _POINTS_B[outcome]
+                    item_wdl[item, a, outcome] += 1
+                    item_wdl[item, b, 2 - outcome] += 1
+
+                # Finishing place = teams ahead on points, ties broken by input
+                # order (same as the stable sorted() standings)
+                for i in range(n):
+                    rank = 0
+                    for j in range(n):
+                        if points[j] > points[i] or (points[j] == points[i] and j < i):
+                            rank += 1
+                    item_positions[item, i, rank] += 1
+                item_points[item] += points
+
+        positions = np.zeros((n_groups, n, n), dtype=np.int64)
+        wdl_sum = np.zeros((n_groups, n, 3), dtype=np.int64)
+        points_sum = np.zeros((n_groups, n), dtype=np.int64)
+        for item in range(n_items):
+            g = item // n_chunks
+            positions[g] += item_positions[item]
+            wdl_sum[g] += item_wdl[item]
+            points_sum[g] += item_points[item]
+
+        return positions, wdl_sum, points_sum
+else:
+    _simulate_groups_numba = None
+
+
+def _simulate_groups_numpy(n: int, pair_a: np.ndarray, pair_b: np.ndarray,
+                           win_thr: np.ndarray, draw_cum_thr: np.ndarray, iterations: int,
+                           rng: np.random.Generator) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Vectorized group Monte Carlo over all G groups at once: the matches of
+    MC_BATCH_SIZE iterations of every group are drawn in a single
+    rng.random((G, batch, n_matches)) call from the one generator. Same
+    arguments and return layout as _simulate_groups_numba.
+    """
+    n_groups = win_thr.shape[0]
+    win_thr = win_thr[:, np.newaxis, :]
+    draw_cum_thr = draw_cum_thr[:, np.newaxis, :]
+    earlier = np.tri(n, k=-1, dtype=bool)  # earlier[i, j] = j < i
+    places = np.arange(n)
+    positions = np.zeros((n_groups, n, n), dtype=np.int64)
+    wdl_sum = np.zeros((n_groups, n, 3), dtype=np.int64)
+    points_sum = np.zeros((n_groups, n), dtype=np.int64)
+
+    for start in range(0, iterations, MC_BATCH_SIZE):
+        batch = min(MC_BATCH_SIZE, iterations - start)
+        r = rng.random((n_groups, batch, len(pair_a)))
+        outcome = (r >= win_thr).astype(np.int8) + (r >= draw_cum_thr)
+
+        # Scatter per-match points onto the teams involved. A group total
+        # never exceeds 3 * (n - 1) points, so int8 keeps the working set small
+        points = np.zeros((n_groups, batch, n), dtype=np.int8)
+        np.add.at(points, (slice(None), slice(None), pair_a), _POINTS_A[outcome])
+        np.add.at(points, (slice(None), slice(None), pair_b), _POINTS_B[outcome])
+        points_sum += points.sum(axis=1)
+
+        # match_wdl[g, m] = (home wins, draws, away wins) for match m of group g
+        match_wdl = (outcome[..., np.newaxis] == np.arange(3)).sum(axis=1)
+        np.add.at(wdl_sum, (slice(None), pair_a), match_wdl)
+        np.add.at(wdl_sum, (slice(None), pair_b), match_wdl[:, :, ::-1])
+
+        # Finishing place = teams ahead on points, ties broken by input order
+        # (same as the stable sorted() standings); no per-iteration sort needed
+        others = points[:, :, np.newaxis, :]
+        own = points[:, :, :, np.newaxis]
+        ranks = ((others > own) | ((others == own) & earlier)).sum(axis=3)
+        positions += (ranks[..., np.newaxis] == places).sum(axis=1)
+
+    return positions, wdl_sum, points_sum
+
+
+def simulate_groups_monte_carlo(groups: Dict[str, List[Tuple[str, float]]],
+                                iterations: int = MC_ITERATIONS,
+                                rng: np.random.Generator = None) -> Dict[str, Dict]:
+    """
+    Run Monte Carlo simulation for several same-sized groups in one batch.
+
+    Returns {group_name: simulate_group_monte_carlo-style results}.
+    """
+    if rng is None:
+        rng = RNG
+    names = list(groups)
+    sizes = {len(groups[name]) for name in names}
+    if len(sizes) != 1:
+        raise ValueError(f"All groups must have the same number of teams, got sizes {sorted(sizes)}")
+
+    # Split the round-robin into parallel per-match arrays (team indices and Elos)
+    n = sizes.pop()
+    elos = np.array([[elo for _, elo in groups[name]] for name in names], dtype=np.float64)
+    pair_a, pair_b = np.triu_indices(n, k=1)
+    elo_a, elo_b = elos[:, pair_a], elos[:, pair_b]
+
+    # Match probabilities are fixed for the whole run: compute the outcome
+    # thresholds once per pairing rather than once per simulated match
+    probs = get_match_probabilities_vec(elo_a, elo_b)
+    win_thr = probs.win
+    draw_cum_thr = probs.win + probs.draw
+
+    if _simulate_groups_numba is not None:
+        n_chunks = max(1, -(-iterations // MC_PARALLEL_CHUNK))
+        seeds = rng.integers(2 ** 32, size=(len(names), n_chunks))
+        positions, wdl_sum, points_sum = _simulate_groups_numba(
+            n, pair_a, pair_b, win_thr, draw_cum_thr, iterations, seeds)
+    else:
+        positions, wdl_sum, points_sum = _simulate_groups_numpy(
+            n, pair_a, pair_b, win_thr, draw_cum_thr, iterations, rng)
+
+    # Direct qualification (top two) tallied once from the position histogram
+    top2 = positions[:, :, 0] + positions[:, :, 1]
 
     # Calculate averages
-    results = {}
-    for code, elo in team_elos:
-        s = stats[code]
-        results[code] = {
-            'elo': elo,
-            'avg_wins': s['wins'] / iterations,
-            'avg_draws': s['draws'] / iterations,
-            'avg_losses': s['losses'] / iterations,
-            'avg_points': s['points'] / iterations,
-            'pos1_prob': s['positions'][0] / iterations,
-            'pos2_prob': s['positions'][1] / iterations,
-            'pos3_prob': s['positions'][2] / iterations,
-            'pos4_prob': s['positions'][3] / iterations
-        }
-    return results
+    all_results = {}
+    for g, name in enumerate(names):
+        results = {}
+        for i, (code, elo) in enumerate(groups[name]):
+            results[code] = {
+                'elo': elo,
+                'avg_wins': wdl_sum[g, i, 0] / iterations,
+                'avg_draws': wdl_sum[g, i, 1] / iterations,
+                'avg_losses': wdl_sum[g, i, 2] / iterations,
+                'avg_points': points_sum[g, i] / iterations,
+                'pos1_prob': positions[g, i, 0] / iterations,
+                'pos2_prob': positions[g, i, 1] / iterations,
+                'pos3_prob': positions[g, i, 2] / iterations,
+                'pos4_prob': positions[g, i, 3] / iterations,
+                'top2_prob': top2[g, i] / iterations
+            }
+        all_results[name] = results
+    return all_results
+
+
+def simulate_group_monte_carlo(team_elos: List[Tuple[str, float]], iterations: int = MC_ITERATIONS,
+                               rng: np.random.Generator = None) -> Dict:
+    """Run Monte Carlo simulation for a 4-team group."""
+    return simulate_groups_monte_carlo({'': team_elos}, iterations=iterations, rng=rng)['']
 
 
 # =============================================================================
 # Server Data Fetching
 # =============================================================================
 
+# One keep-alive connection reused for every endpoint request
+_connection = None
+_connection_url = None
+
+
+def _get_connection() -> http.client.HTTPConnection:
+    """Return the shared connection to SERVER_URL, opening it on first use."""
+    global _connection, _connection_url
+    if _connection is None or _connection_url != SERVER_URL:
+        _close_connection()
+        parts = urllib.parse.urlsplit(SERVER_URL)
+        if parts.scheme == 'https':
+            connection_class = http.client.HTTPSConnection
+        elif parts.scheme == 'http':
+            connection_class = http.client.HTTPConnection
+        else:
+            raise ValueError(f"Unsupported SERVER_URL scheme {parts.scheme!r}, expected http or https")
+        _connection = connection_class(parts.hostname, parts.port, timeout=30)
+        _connection_url = SERVER_URL
+    return _connection
+
+
+def _close_connection():
+    global _connection
+    if _connection is not None:
+        _connection.close()
+        _connection = None
+
+
 def fetch_json(endpoint: str) -> dict:
-    """Fetch JSON data from server endpoint."""
+    """Fetch JSON data from server endpoint (gzip-aware, parsed straight from bytes)."""
     url = f"{SERVER_URL}{endpoint}"
     try:
-        with urllib.request.urlopen(url, timeout=30) as response:
-            return json.loads(response.read().decode())
+        # A reused socket may have been closed by the server's keep-alive
+        # timeout; reconnect once before giving up
+        for attempt in range(2):
+            try:
+                conn = _get_connection()
+                conn.request('GET', endpoint, headers={'Accept-Encoding': 'gzip'})
+                response = conn.getresponse()
+                raw = response.read()
+                break
+            except (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError):
+                _close_connection()
+                if attempt:
+                    raise
+
+        if response.status != 200:
+            raise http.client.HTTPException(f"HTTP {response.status} {response.reason}")
+        if response.getheader('Content-Encoding') == 'gzip':
+            raw = gzip.decompress(raw)
+        return _json_loads(raw)
     except Exception as e:
+        _close_connection()
         print(f"Error fetching {url}: {e}")
         raise
 
@@ -169,14 +423,31 @@ def fetch_json(endpoint: str) -> dict:
 # Test Suite
 # =============================================================================
 
+@dataclass(slots=True)
+class TestRecord:
+    """A single recorded check."""
+    name: str
+    passed: bool
+    message: str = ""
+
+
 class TestResults:
     def __init__(self):
         self.passed = 0
         self.failed = 0
-        self.tests = []
-
-    def add(self, name: str, passed: bool, message: str = ""):
-        self.tests.append((name, passed, message))
+        self.tests: List[TestRecord] = []
+
+    def add(self, name: str, passed: bool, message: Union[str, Callable[[], str]] = ""):
+        """
+        Record a check. `message` may be a zero-argument callable so hot call
+        sites only pay for formatting it when the check fails.
+        """
+        passed = bool(passed)
+        if passed:
+            message = ""
+        elif callable(message):
+            message = message()
+        self.tests.append(TestRecord(name, passed, message))
         if passed:
             self.passed += 1
         else:
@@ -187,15 +458,14 @@ class TestResults:
         print("TEST RESULTS SUMMARY")
         print("=" * 70)
 
-        # Group by category
-        failed_tests = [(n, m) for n, p, m in self.tests if not p]
-
-        if failed_tests:
+        if self.failed:
             print("\nFAILED TESTS:")
-            for name, message in failed_tests:
-                print(f"  [FAIL] {name}")
-                if message:
-                    print(f"         {message}")
+            for record in self.tests:
+                if record.passed:
+                    continue
+                print(f"  [FAIL] {record.name}")
+                if record.message:
+                    print(f"         {record.message}")
 
         print("-" * 70)
         print(f"Total: {self.passed + self.failed} | Passed: {self.passed} | Failed: {self.failed}")
@@ -265,57 +535,74 @@ def test_playoff_probabilities(results: TestResults, playoff_sim: dict, ratings:
     """Validate playoff simulation probability calculations."""
     print("\n--- Testing Playoff Probability Calculations ---")
 
-    for bracket_name, bracket in playoff_sim.get('intercontinental', {}).items():
+    brackets = playoff_sim.get('intercontinental', {})
+    paths = playoff_sim.get('uefa', {})
+
+    # Recompute every bracket's and every path's expected Elo in one batch each
+    bracket_inputs = {}
+    for bracket_name, bracket in brackets.items():
+        teams = bracket.get('teams', [])
+        if len(teams) >= 3:
+            seeded = teams[0]
+            unseeded = [t for t in teams if t != seeded]
+            if len(unseeded) == 2:
+                bracket_inputs[bracket_name] = (seeded['elo'], [t['elo'] for t in unseeded])
+    local_bracket_elos = {}
+    if bracket_inputs:
+        seeded_elos, unseeded_elos = zip(*bracket_inputs.values())
+        sim = simulate_brackets_vec(seeded_elos, unseeded_elos)
+        local_bracket_elos = dict(zip(bracket_inputs, sim['expected_elo'].tolist()))
+
+    path_inputs = {path_name: [t['elo'] for t in path.get('teams', [])]
+                   for path_name, path in paths.items() if len(path.get('teams', [])) == 4}
+    local_path_elos = {}
+    if path_inputs:
+        sim = simulate_uefa_paths_vec(list(path_inputs.values()))
+        local_path_elos = dict(zip(path_inputs, sim['expected_elo'].tolist()))
+
+    for bracket_name, bracket in brackets.items():
         teams = bracket.get('teams', [])
         if len(teams) >= 3:
             prob_sum = sum(t['prob'] for t in teams)
             results.add(
                 f"IC {bracket_name}: probs sum to 1",
                 abs(prob_sum - 1.0) < 0.001,
-                f"Sum was {prob_sum:.4f}"
+                lambda: f"Sum was {prob_sum:.4f}"
             )
 
-            seeded = teams[0]
-            unseeded = [t for t in teams if t != seeded]
-
-            if len(unseeded) == 2:
-                local_sim = simulate_bracket(
-                    seeded['elo'],
-                    [unseeded[0]['elo'], unseeded[1]['elo']]
-                )
-
+            if bracket_name in local_bracket_elos:
                 server_expected = bracket.get('expectedElo', 0)
-                local_expected = local_sim['expected_elo']
+                local_expected = local_bracket_elos[bracket_name]
 
                 results.add(
                     f"IC {bracket_name}: expected Elo matches",
                     abs(server_expected - local_expected) <= 1,
-                    f"Server: {server_expected}, Local: {local_expected}"
+                    lambda: f"Server: {server_expected}, Local: {local_expected}"
                 )
 
-    for path_name, path in playoff_sim.get('uefa', {}).items():
-        teams = path.get('teams', [])
-        if len(teams) == 4:
-            prob_sum = sum(t['prob'] for t in teams)
+    for path_name, path in paths.items():
+        if path_name in local_path_elos:
+            prob_sum = sum(t['prob'] for t in path['teams'])
             results.add(
                 f"UEFA {path_name}: probs sum to 1",
                 abs(prob_sum - 1.0) < 0.001,
-                f"Sum was {prob_sum:.4f}"
+                lambda: f"Sum was {prob_sum:.4f}"
             )
 
-            team_elos = [t['elo'] for t in teams]
-            local_sim = simulate_uefa_path(team_elos)
-
             server_expected = path.get('expectedElo', 0)
-            local_expected = local_sim['expected_elo']
+            local_expected = local_path_elos[path_name]
 
             results.add(
                 f"UEFA {path_name}: expected Elo matches",
                 abs(server_expected - local_expected) <= 1,
-                f"Server: {server_expected}, Local: {local_expected}"
+                lambda: f"Server: {server_expected}, Local: {local_expected}"
             )
 
 
+# Knockout-stage probabilities in round order; each must be <= the one before
+_PROGRESSION_KEYS = ('r32Prob', 'r16Prob', 'qfProb', 'sfProb', 'finalProb', 'winProb')
+
+
 def test_group_simulation_validity(results: TestResults, group_sim: dict):
     """Validate group simulation data structure and basic constraints."""
     print("\n--- Testing Group Simulation Validity (All 12 Groups) ---")
@@ -325,50 +612,45 @@ def test_group_simulation_validity(results: TestResults, group_sim: dict):
         if not group_data:
             continue
 
+        codes = [team.get('code', '?') for team in group_data]
+        pos_matrix = np.array([[team.get(f'pos{pos}Prob', 0) for pos in range(1, 5)]
+                               for team in group_data])
+        progression = np.array([[team.get(key, 0) for key in _PROGRESSION_KEYS]
+                                for team in group_data])
+
         # Check position probabilities sum to 1 for each team
-        for team in group_data:
-            pos_sum = (team.get('pos1Prob', 0) + team.get('pos2Prob', 0) +
-                       team.get('pos3Prob', 0) + team.get('pos4Prob', 0))
+        for code, pos_sum in zip(codes, pos_matrix.sum(axis=1)):
             results.add(
-                f"Group {group_name} {team.get('code', '?')}: position probs sum to 1",
+                f"Group {group_name} {code}: position probs sum to 1",
                 abs(pos_sum - 1.0) < 0.01,
-                f"Sum was {pos_sum:.4f}"
+                lambda: f"Sum was {pos_sum:.4f}"
             )
 
         # Check total position probabilities across all teams
-        for pos in range(1, 5):
-            pos_key = f'pos{pos}Prob'
-            total = sum(t.get(pos_key, 0) for t in group_data)
+        for pos, total in enumerate(pos_matrix.sum(axis=0), start=1):
             results.add(
                 f"Group {group_name}: position {pos} total = 1",
                 abs(total - 1.0) < 0.01,
-                f"Total was {total:.4f}"
+                lambda: f"Total was {total:.4f}"
             )
 
         # Check r32Prob >= pos1 + pos2
-        for team in group_data:
-            min_qualify = team.get('pos1Prob', 0) + team.get('pos2Prob', 0)
-            server_r32 = team.get('r32Prob', 0)
+        min_qualify = pos_matrix[:, 0] + pos_matrix[:, 1]
+        for code, server_r32, qualify in zip(codes, progression[:, 0], min_qualify):
             results.add(
-                f"Group {group_name} {team.get('code', '?')}: r32Prob >= pos1+pos2",
-                server_r32 >= min_qualify - 0.001,
-                f"r32Prob: {server_r32:.4f}, pos1+pos2: {min_qualify:.4f}"
+                f"Group {group_name} {code}: r32Prob >= pos1+pos2",
+                server_r32 >= qualify - 0.001,
+                lambda: f"r32Prob: {server_r32:.4f}, pos1+pos2: {qualify:.4f}"
             )
 
         # Check tournament progression is monotonically decreasing
-        for team in group_data:
-            r32 = team.get('r32Prob', 0)
-            r16 = team.get('r16Prob', 0)
-            qf = team.get('qfProb', 0)
-            sf = team.get('sfProb', 0)
-            final = team.get('finalProb', 0)
-            win = team.get('winProb', 0)
-
-            probs_decrease = r32 >= r16 >= qf >= sf >= final >= win
+        probs_decrease = (np.diff(progression, axis=1) <= 0).all(axis=1)
+        for code, row, decreasing in zip(codes, progression, probs_decrease):
+            r32, r16, qf, sf, final, win = row
             results.add(
-                f"Group {group_name} {team.get('code', '?')}: tournament probs decrease",
-                probs_decrease,
-                f"R32:{r32:.3f} R16:{r16:.3f} QF:{qf:.3f} SF:{sf:.3f} F:{final:.3f} W:{win:.3f}"
+                f"Group {group_name} {code}: tournament probs decrease",
+                decreasing,
+                lambda: f"R32:{r32:.3f} R16:{r16:.3f} QF:{qf:.3f} SF:{sf:.3f} F:{final:.3f} W:{win:.3f}"
             )
 
 
@@ -385,22 +667,18 @@ def run_comprehensive_monte_carlo_comparison(group_sim: dict, results: TestResul
     comparison_data = {}
     tolerance = 0.02  # 2% tolerance for MC variance
 
-    all_groups = sorted(group_sim.keys())
-
-    for group_name in all_groups:
-        group_data = group_sim.get(group_name, [])
-        if not group_data or len(group_data) != 4:
-            continue
-
-        print(f"\nSimulating Group {group_name}...", end=" ", flush=True)
-
-        # Get team elos from server data
-        team_elos = [(t['code'], t['elo']) for t in group_data]
+    all_groups = [name for name in sorted(group_sim.keys())
+                  if len(group_sim.get(name, [])) == 4]
 
-        # Run local Monte Carlo
-        local_results = simulate_group_monte_carlo(team_elos, iterations=MC_ITERATIONS)
+    # All groups run the same 6-match simulation, so batch them into one call
+    group_elos = {name: [(t['code'], t['elo']) for t in group_sim[name]] for name in all_groups}
+    print(f"\nSimulating {len(group_elos)} groups...", end=" ", flush=True)
+    group_results = simulate_groups_monte_carlo(group_elos, iterations=MC_ITERATIONS) if group_elos else {}
+    print("Done.")
 
-        print("Done.")
+    for group_name in all_groups:
+        group_data = group_sim[group_name]
+        local_results = group_results[group_name]
 
         # Store comparison for this group
         group_comparison = []
@@ -419,12 +697,14 @@ def run_comprehensive_monte_carlo_comparison(group_sim: dict, results: TestResul
                     'pos2': team.get('pos2Prob', 0),
                     'pos3': team.get('pos3Prob', 0),
                     'pos4': team.get('pos4Prob', 0),
+                    'top2': team.get('pos1Prob', 0) + team.get('pos2Prob', 0),
                 },
                 'local': {
                     'pos1': local.get('pos1_prob', 0),
                     'pos2': local.get('pos2_prob', 0),
                     'pos3': local.get('pos3_prob', 0),
                     'pos4': local.get('pos4_prob', 0),
+                    'top2': local.get('top2_prob', 0),
                     'avg_wins': local.get('avg_wins', 0),
                     'avg_draws': local.get('avg_draws', 0),
                     'avg_losses': local.get('avg_losses', 0),
@@ -443,7 +723,7 @@ def run_comprehensive_monte_carlo_comparison(group_sim: dict, results: TestResul
                 results.add(
                     f"Group {group_name} {code}: {pos} within {tolerance*100:.0f}%",
                     passed,
-                    f"Server: {comparison['server'][pos]:.4f}, Local: {comparison['local'][pos]:.4f}, Diff: {diff:.4f}"
+                    lambda: f"Server: {comparison['server'][pos]:.4f}, Local: {comparison['local'][pos]:.4f}, Diff: {diff:.4f}"
                 )
 
             group_comparison.append(comparison)
@@ -499,8 +779,10 @@ def display_monte_carlo_comparison(comparison_data: Dict):
                 else:
                     print(f"{'':<20} {'':<5} │ {pos:<6} │ {server_val*100:>7.2f}% │ {local_val*100:>7.2f}% │ {diff*100:>6.2f}% │ {status:<6}")
 
-            # Show local simulation stats (wins/draws/losses/points)
+            # Direct qualification (top two), then local simulation stats (wins/draws/losses/points)
             local = team['local']
+            top2_diff = abs(team['server']['top2'] - local['top2'])
+            print(f"{'':<20} {'':<5} │ {'Top2':<6} │ {team['server']['top2']*100:>7.2f}% │ {local['top2']*100:>7.2f}% │ {top2_diff*100:>6.2f}% │")
             print(f"{'':<20} {'':<5} │ {'W/D/L':<6} │ {local['avg_wins']:>7.2f}  │ {local['avg_draws']:>7.2f}  │ {local['avg_losses']:>6.2f}  │")
             print(f"{'':<20} {'':<5} │ {'Pts':<6} │ {local['avg_points']:>7.2f}  │ {'':<8} │ {'':<7} │")
             print()
@@ -523,20 +805,25 @@ def test_win_probability_edge_cases(results: TestResults):
     probs = get_match_probabilities(1600, 1600)
     results.add(
         "Equal teams: win == loss",
-        abs(probs['win'] - probs['loss']) < 0.0001
+        abs(probs.win - probs.loss) < 0.0001
     )
 
-    for diff in [0, 100, 500, 1000]:
-        probs = get_match_probabilities(1600 + diff, 1600)
-        total = probs['win'] + probs['draw'] + probs['loss']
+    # Probe every diff in one vectorized call
+    diffs = np.array([0, 100, 500, 1000])
+    probs = get_match_probabilities_vec(1600 + diffs, 1600)
+    probs = np.stack([probs.win, probs.draw, probs.loss])
+    totals = probs.sum(axis=0)
+    in_range = ((probs >= 0) & (probs <= 1)).all(axis=0)
+
+    for diff, total, valid in zip(diffs, totals, in_range):
         results.add(
             f"Elo diff {diff}: probs sum to 1",
             abs(total - 1.0) < 0.0001,
-            f"Sum was {total:.6f}"
+            lambda: f"Sum was {total:.6f}"
         )
         results.add(
             f"Elo diff {diff}: all probs in [0,1]",
-            all(0 <= p <= 1 for p in probs.values())
+            bool(valid)
         )
 
 
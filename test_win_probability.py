@@ -11,10 +11,39 @@ World Cup 2026 analyzer. It tests:
 """
 
 import math
-import random
-from typing import Tuple, Dict
+import os
+import sys
+from functools import lru_cache
+from typing import Callable, List, NamedTuple, Tuple, Union
 from dataclasses import dataclass
 
+import numpy as np
+
+try:
+    from numba import njit, prange
+except ImportError:
+    njit = None
+
+try:
+    import mc_kernel  # Optional Cython build of the Monte Carlo loop (see README)
+except ImportError:
+    mc_kernel = None
+
+# 10^(x / 400) == exp(x * _ALPHA); exp is cheaper than a general pow
+_ALPHA = math.log(10) / 400
+
+# Draw model (sosCalculator.js): max(_DRAW_FLOOR, _DRAW_BASE - |diff| * _DRAW_SLOPE)
+_DRAW_BASE = 0.27
+_DRAW_SLOPE = 0.0004
+_DRAW_FLOOR = 0.15
+
+MC_SEED = 0xC0FFEE  # Fixed so Monte Carlo runs are reproducible
+MC_PARALLEL_CHUNK = 2000  # Iterations per independently seeded chunk in the numba kernel
+FAST_TESTS = bool(os.environ.get('FAST_TESTS'))  # Run fewer Monte Carlo matches with a wider tolerance
+
+# Process-wide generator used when a caller does not pass its own
+RNG = np.random.default_rng(MC_SEED)
+
 
 # =============================================================================
 # Core Win Probability Functions (matching sosCalculator.js implementation)
@@ -28,10 +57,18 @@ def elo_win_probability(rating1: float, rating2: float) -> float:
 
     This matches sosCalculator.js:48-50 and bracketSimulator.js:10
     """
-    return 1 / (1 + math.pow(10, (rating2 - rating1) / 400))
+    return 1 / (1 + math.exp((rating2 - rating1) * _ALPHA))
+
 
+class Probs(NamedTuple):
+    """Outcome probabilities for one match, from the first team's side."""
+    win: float
+    draw: float
+    loss: float
+    win_expectancy: float  # Raw Elo value before draw adjustment
 
-def get_match_probabilities(team_elo: float, opp_elo: float) -> Dict[str, float]:
+
+def get_match_probabilities(team_elo: float, opp_elo: float) -> Probs:
     """
     Calculate win, draw, and loss probabilities for a group stage match.
 
@@ -43,57 +80,174 @@ def get_match_probabilities(team_elo: float, opp_elo: float) -> Dict[str, float]
     - Redistributes win expectancy across three outcomes
     """
     # Base win probability using Elo formula
-    win_expectancy = 1 / (1 + math.pow(10, (opp_elo - team_elo) / 400))
+    win_expectancy = 1 / (1 + math.exp((opp_elo - team_elo) * _ALPHA))
 
     # Draw probability: ~27% at equal ratings, decreasing with Elo gap (min 15%)
     elo_diff = abs(team_elo - opp_elo)
-    draw_prob = max(0.15, 0.27 - elo_diff * 0.0004)
+    draw_prob = max(_DRAW_FLOOR, _DRAW_BASE - elo_diff * _DRAW_SLOPE)
 
     # Redistribute win expectancy to three outcomes
     win_prob = win_expectancy * (1 - draw_prob)
     loss_prob = (1 - win_expectancy) * (1 - draw_prob)
 
-    return {
-        'win': win_prob,
-        'draw': draw_prob,
-        'loss': loss_prob,
-        'win_expectancy': win_expectancy  # Raw Elo value before draw adjustment
-    }
+    return Probs(win_prob, draw_prob, loss_prob, win_expectancy)
+
+
+def get_match_probabilities_vec(team_elos, opp_elos) -> Probs:
+    """Vectorized get_match_probabilities: a Probs of arrays, broadcast over the inputs."""
+    elo_diffs = np.asarray(team_elos, dtype=np.float64) - np.asarray(opp_elos, dtype=np.float64)
+    win_expectancy = 1 / (1 + np.exp(-elo_diffs * _ALPHA))
+    draw_prob = np.maximum(_DRAW_FLOOR, _DRAW_BASE - np.abs(elo_diffs) * _DRAW_SLOPE)
+    win_prob = win_expectancy * (1 - draw_prob)
+    loss_prob = (1 - win_expectancy) * (1 - draw_prob)
+    return Probs(win_prob, draw_prob, loss_prob, win_expectancy)
+
+
+# =============================================================================
+# Monte Carlo Match Simulation (matching sosCalculator.js:253-260)
+# =============================================================================
+
+if njit is not None:
+    @njit(parallel=True, cache=True)
+    def _mc_counts_numba(team_elos, opp_elos, n, seeds):
+        """
+        Compiled simulation loop used by mc_counts when numba is installed.
+
+        Each pairing's n matches are split into seeds.shape[1] chunks, and all
+        k * chunks work items run across threads with prange. Each chunk
+        reseeds the generator and tallies into its own row, so results don't
+        depend on the thread count.
+        """
+        n_cases = team_elos.shape[0]
+        n_chunks = seeds.shape[1]
+        chunk_size = (n + n_chunks - 1) // n_chunks
+        n_items = n_cases * n_chunks
+
+        item_counts = np.zeros((n_items, 2), dtype=np.int64)
+        for item in prange(n_items):
+            k = item // n_chunks
+            c = item % n_chunks
+            np.random.seed(seeds[k, c])
+
+            win_exp = 1.0 / (1.0 + math.exp((opp_elos[k] - team_elos[k]) * _ALPHA))
+            draw = max(_DRAW_FLOOR, _DRAW_BASE - abs(team_elos[k] - opp_elos[k]) * _DRAW_SLOPE)
+            win = win_exp * (1.0 - draw)
+
+            wins = 0
+            draws = 0
+            for _ in range(c * chunk_size, min(n, (c + 1) * chunk_size)):
+                rand = np.random.random()
+                if rand < win:
+                    wins += 1
+                elif rand < win + draw:
+                    draws += 1
+            item_counts[item, 0] = wins
+            item_counts[item, 1] = draws
+
+        counts = np.zeros((n_cases, 3), dtype=np.int64)
+        for item in range(n_items):
+            k = item // n_chunks
+            counts[k, 0] += item_counts[item, 0]
+            counts[k, 1] += item_counts[item, 1]
+        for k in range(n_cases):
+            counts[k, 2] = n - counts[k, 0] - counts[k, 1]
+        return counts
+else:
+    _mc_counts_numba = None
+
+
+def mc_counts(team_elos, opp_elos, n: int, rng: np.random.Generator = None) -> np.ndarray:
+    """
+    Simulate n matches for each (team_elos[k], opp_elos[k]) pairing and
+    return a (k, 3) array of (wins, draws, losses) counts for the team.
+
+    Each match draws rand in [0, 1): rand < win is a win, rand < win + draw
+    a draw, otherwise a loss. Uses a parallel numba loop when available,
+    then the compiled mc_kernel extension; otherwise every pairing is
+    simulated from one (k, n) random block.
+    """
+    if rng is None:
+        rng = RNG
+    team_elos = np.asarray(team_elos, dtype=np.float64)
+    opp_elos = np.asarray(opp_elos, dtype=np.float64)
+    if _mc_counts_numba is not None:
+        # The compiled loop has its own generator; seed each chunk from rng
+        n_chunks = max(1, -(-n // MC_PARALLEL_CHUNK))
+        seeds = rng.integers(2 ** 32, size=(len(team_elos), n_chunks))
+        return _mc_counts_numba(team_elos, opp_elos, n, seeds)
+    if mc_kernel is not None:
+        return mc_kernel.mc_counts(team_elos, opp_elos, n, int(rng.integers(2 ** 63)))
+
+    probs = get_match_probabilities_vec(team_elos, opp_elos)
+    cum = np.column_stack([probs.win, probs.win + probs.draw])
+
+    # Outcome code per match (0 = win, 1 = draw, 2 = loss) is the number of
+    # cumulative thresholds at or below rand, then tallied in one pass
+    rand = rng.random((len(team_elos), n))
+    counts = np.empty((len(team_elos), 3), dtype=np.int64)
+    for k in range(len(team_elos)):
+        codes = np.searchsorted(cum[k], rand[k], side='right')
+        counts[k] = np.bincount(codes, minlength=3)
+    return counts
 
 
 # =============================================================================
 # Test Suite
 # =============================================================================
 
+@lru_cache(maxsize=512)
+def _cached_probs(team_elo: float, opp_elo: float) -> Probs:
+    """
+    Memoized get_match_probabilities for the test loops, which probe the same
+    rating pairs repeatedly.
+    """
+    return get_match_probabilities(team_elo, opp_elo)
+
+
+@dataclass(slots=True)
+class TestRecord:
+    """A single recorded check."""
+    name: str
+    passed: bool
+    message: str = ""
+
+
 class TestResults:
     """Track test results."""
-    def __init__(self):
-        self.passed = 0
-        self.failed = 0
-        self.tests = []
+    __slots__ = ('tests',)
 
-    def add(self, name: str, passed: bool, message: str = ""):
-        self.tests.append((name, passed, message))
+    def __init__(self):
+        self.tests: List[TestRecord] = []
+
+    def add(self, name: str, passed: bool, message: Union[str, Callable[[], str]] = ""):
+        """
+        Record a check. `message` may be a zero-argument callable so call
+        sites only pay for formatting it when the check fails.
+        """
+        passed = bool(passed)
         if passed:
-            self.passed += 1
-        else:
-            self.failed += 1
+            message = ""
+        elif callable(message):
+            message = message()
+        self.tests.append(TestRecord(name, passed, message))
 
     def report(self):
-        print("\n" + "=" * 70)
-        print("TEST RESULTS")
-        print("=" * 70)
+        # Build the whole report and write it in one go
+        lines = ["", "=" * 70, "TEST RESULTS", "=" * 70]
 
-        for name, passed, message in self.tests:
-            status = "PASS" if passed else "FAIL"
-            print(f"[{status}] {name}")
-            if message and not passed:
-                print(f"       {message}")
+        for record in self.tests:
+            status = "PASS" if record.passed else "FAIL"
+            lines.append(f"[{status}] {record.name}")
+            if record.message:
+                lines.append(f"       {record.message}")
 
-        print("-" * 70)
-        print(f"Total: {self.passed + self.failed} | Passed: {self.passed} | Failed: {self.failed}")
-        print("=" * 70)
-        return self.failed == 0
+        lines.append("-" * 70)
+        passed = sum(record.passed for record in self.tests)
+        failed = len(self.tests) - passed
+        lines.append(f"Total: {len(self.tests)} | Passed: {passed} | Failed: {failed}")
+        lines.append("=" * 70)
+        sys.stdout.write("\n".join(lines) + "\n")
+        return failed == 0
 
 
 def test_basic_elo_formula(results: TestResults):
@@ -105,7 +259,7 @@ def test_basic_elo_formula(results: TestResults):
     results.add(
         "Equal ratings (1600 vs 1600) = 50%",
         abs(prob - 0.5) < 0.0001,
-        f"Expected 0.5, got {prob:.6f}"
+        lambda: f"Expected 0.5, got {prob:.6f}"
     )
 
     # Test 2: Higher rating should give >50%
@@ -113,7 +267,7 @@ def test_basic_elo_formula(results: TestResults):
     results.add(
         "Higher rating (1700 vs 1600) > 50%",
         prob > 0.5,
-        f"Expected >0.5, got {prob:.6f}"
+        lambda: f"Expected >0.5, got {prob:.6f}"
     )
 
     # Test 3: Lower rating should give <50%
@@ -121,7 +275,7 @@ def test_basic_elo_formula(results: TestResults):
     results.add(
         "Lower rating (1500 vs 1600) < 50%",
         prob < 0.5,
-        f"Expected <0.5, got {prob:.6f}"
+        lambda: f"Expected <0.5, got {prob:.6f}"
     )
 
     # Test 4: 400 point difference should give ~91% (known value)
@@ -131,7 +285,7 @@ def test_basic_elo_formula(results: TestResults):
     results.add(
         "400 point advantage gives ~90.9%",
         abs(prob - expected) < 0.0001,
-        f"Expected {expected:.6f}, got {prob:.6f}"
+        lambda: f"Expected {expected:.6f}, got {prob:.6f}"
     )
 
     # Test 5: Symmetry - probabilities should sum to 1
@@ -140,7 +294,7 @@ def test_basic_elo_formula(results: TestResults):
     results.add(
         "Symmetry: P(A beats B) + P(B beats A) = 1",
         abs(prob1 + prob2 - 1.0) < 0.0001,
-        f"Sum was {prob1 + prob2:.6f}, expected 1.0"
+        lambda: f"Sum was {prob1 + prob2:.6f}, expected 1.0"
     )
 
     # Test 6: 200 point difference
@@ -150,7 +304,7 @@ def test_basic_elo_formula(results: TestResults):
     results.add(
         "200 point advantage gives ~76%",
         abs(prob - expected) < 0.0001,
-        f"Expected {expected:.6f}, got {prob:.6f}"
+        lambda: f"Expected {expected:.6f}, got {prob:.6f}"
     )
 
 
@@ -159,62 +313,63 @@ def test_three_outcome_model(results: TestResults):
     print("\n--- Testing Three-Outcome Model ---")
 
     # Test 1: Probabilities should sum to 1
-    probs = get_match_probabilities(1600, 1600)
-    total = probs['win'] + probs['draw'] + probs['loss']
+    probs = _cached_probs(1600, 1600)
+    total = probs.win + probs.draw + probs.loss
     results.add(
         "Probabilities sum to 1 (equal ratings)",
         abs(total - 1.0) < 0.0001,
-        f"Sum was {total:.6f}"
+        lambda: f"Sum was {total:.6f}"
     )
 
     # Test 2: Equal ratings - equal win/loss, draw ~27%
-    probs = get_match_probabilities(1600, 1600)
+    probs = _cached_probs(1600, 1600)
     results.add(
         "Equal ratings: draw probability = 27%",
-        abs(probs['draw'] - 0.27) < 0.0001,
-        f"Expected 0.27, got {probs['draw']:.6f}"
+        abs(probs.draw - 0.27) < 0.0001,
+        lambda: f"Expected 0.27, got {probs.draw:.6f}"
     )
 
     results.add(
         "Equal ratings: win = loss",
-        abs(probs['win'] - probs['loss']) < 0.0001,
-        f"Win: {probs['win']:.6f}, Loss: {probs['loss']:.6f}"
+        abs(probs.win - probs.loss) < 0.0001,
+        lambda: f"Win: {probs.win:.6f}, Loss: {probs.loss:.6f}"
     )
 
     # Test 3: Large Elo gap - draw should hit floor of 15%
     # Gap of 300+ should give draw = 0.27 - 300*0.0004 = 0.27 - 0.12 = 0.15
-    probs = get_match_probabilities(1900, 1600)
+    probs = _cached_probs(1900, 1600)
     results.add(
         "300+ point gap: draw at minimum 15%",
-        abs(probs['draw'] - 0.15) < 0.0001,
-        f"Expected 0.15, got {probs['draw']:.6f}"
+        abs(probs.draw - 0.15) < 0.0001,
+        lambda: f"Expected 0.15, got {probs.draw:.6f}"
     )
 
     # Test 4: Probabilities sum to 1 with different ratings
-    for diff in [100, 200, 300, 500]:
-        probs = get_match_probabilities(1600 + diff, 1600)
-        total = probs['win'] + probs['draw'] + probs['loss']
+    diffs = [100, 200, 300, 500]
+    probs = get_match_probabilities_vec(1600 + np.array(diffs), 1600)
+    totals = (probs.win + probs.draw + probs.loss).tolist()
+    for diff, total in zip(diffs, totals):
         results.add(
             f"Probabilities sum to 1 ({diff} point gap)",
             abs(total - 1.0) < 0.0001,
-            f"Sum was {total:.6f}"
+            lambda: f"Sum was {total:.6f}"
         )
 
     # Test 5: Higher rated team has higher win probability
-    probs = get_match_probabilities(1700, 1600)
+    probs = _cached_probs(1700, 1600)
     results.add(
         "Higher rated team has higher win prob",
-        probs['win'] > probs['loss'],
-        f"Win: {probs['win']:.6f}, Loss: {probs['loss']:.6f}"
+        probs.win > probs.loss,
+        lambda: f"Win: {probs.win:.6f}, Loss: {probs.loss:.6f}"
     )
 
     # Test 6: Draw probability decreases with Elo gap
-    probs_equal = get_match_probabilities(1600, 1600)
-    probs_gap = get_match_probabilities(1700, 1600)
+    probs_equal = _cached_probs(1600, 1600)
+    probs_gap = _cached_probs(1700, 1600)
     results.add(
         "Draw prob decreases with Elo gap",
-        probs_gap['draw'] < probs_equal['draw'],
-        f"Equal: {probs_equal['draw']:.6f}, Gap: {probs_gap['draw']:.6f}"
+        probs_gap.draw < probs_equal.draw,
+        lambda: f"Equal: {probs_equal.draw:.6f}, Gap: {probs_gap.draw:.6f}"
     )
 
 
@@ -232,12 +387,15 @@ def test_draw_probability_formula(results: TestResults):
         (500, 0.15),    # Floor
     ]
 
-    for diff, expected_draw in test_cases:
-        probs = get_match_probabilities(1600 + diff, 1600)
+    # Evaluate every gap in one vectorized call
+    diffs = np.array([diff for diff, _ in test_cases])
+    draws = get_match_probabilities_vec(1600 + diffs, 1600).draw.tolist()
+
+    for (diff, expected_draw), draw in zip(test_cases, draws):
         results.add(
             f"Draw prob at {diff} point gap = {expected_draw*100:.0f}%",
-            abs(probs['draw'] - expected_draw) < 0.0001,
-            f"Expected {expected_draw:.4f}, got {probs['draw']:.6f}"
+            abs(draw - expected_draw) < 0.0001,
+            lambda: f"Expected {expected_draw:.4f}, got {draw:.6f}"
         )
 
 
@@ -246,40 +404,40 @@ def test_edge_cases(results: TestResults):
     print("\n--- Testing Edge Cases ---")
 
     # Test 1: Very large Elo difference
-    probs = get_match_probabilities(2500, 1000)
-    total = probs['win'] + probs['draw'] + probs['loss']
+    probs = _cached_probs(2500, 1000)
+    total = probs.win + probs.draw + probs.loss
     results.add(
         "Very large gap (1500 points): probs sum to 1",
         abs(total - 1.0) < 0.0001,
-        f"Sum was {total:.6f}"
+        lambda: f"Sum was {total:.6f}"
     )
     results.add(
         "Very large gap: win prob near ceiling",
-        probs['win'] > 0.8,
-        f"Win prob was {probs['win']:.6f}"
+        probs.win > 0.8,
+        lambda: f"Win prob was {probs.win:.6f}"
     )
 
     # Test 2: Zero/very low ratings
-    probs = get_match_probabilities(100, 100)
-    total = probs['win'] + probs['draw'] + probs['loss']
+    probs = _cached_probs(100, 100)
+    total = probs.win + probs.draw + probs.loss
     results.add(
         "Low ratings (100 vs 100): probs sum to 1",
         abs(total - 1.0) < 0.0001,
-        f"Sum was {total:.6f}"
+        lambda: f"Sum was {total:.6f}"
     )
 
     # Test 3: Negative difference (reversed teams)
-    probs1 = get_match_probabilities(1600, 1700)
-    probs2 = get_match_probabilities(1700, 1600)
+    probs1 = _cached_probs(1600, 1700)
+    probs2 = _cached_probs(1700, 1600)
     results.add(
         "Reversed teams: team1 win = team2 loss",
-        abs(probs1['win'] - probs2['loss']) < 0.0001,
-        f"Team1 win: {probs1['win']:.6f}, Team2 loss: {probs2['loss']:.6f}"
+        abs(probs1.win - probs2.loss) < 0.0001,
+        lambda: f"Team1 win: {probs1.win:.6f}, Team2 loss: {probs2.loss:.6f}"
     )
     results.add(
         "Reversed teams: draws equal",
-        abs(probs1['draw'] - probs2['draw']) < 0.0001,
-        f"Draw1: {probs1['draw']:.6f}, Draw2: {probs2['draw']:.6f}"
+        abs(probs1.draw - probs2.draw) < 0.0001,
+        lambda: f"Draw1: {probs1.draw:.6f}, Draw2: {probs2.draw:.6f}"
     )
 
 
@@ -287,57 +445,46 @@ def test_monte_carlo_consistency(results: TestResults):
     """Test that Monte Carlo simulation matches theoretical probabilities."""
     print("\n--- Testing Monte Carlo Consistency ---")
 
-    def simulate_match(team_elo: float, opp_elo: float) -> str:
-        """Simulate a single match, matching sosCalculator.js:253-260"""
-        probs = get_match_probabilities(team_elo, opp_elo)
-        rand = random.random()
-        if rand < probs['win']:
-            return 'win'
-        elif rand < probs['win'] + probs['draw']:
-            return 'draw'
-        else:
-            return 'loss'
-
-    # Run simulations
-    iterations = 50000
     test_cases = [
         (1600, 1600, "Equal ratings"),
         (1700, 1600, "100 point gap"),
         (1800, 1600, "200 point gap"),
     ]
 
-    for team_elo, opp_elo, desc in test_cases:
-        wins, draws, losses = 0, 0, 0
-        for _ in range(iterations):
-            result = simulate_match(team_elo, opp_elo)
-            if result == 'win':
-                wins += 1
-            elif result == 'draw':
-                draws += 1
-            else:
-                losses += 1
-
-        expected = get_match_probabilities(team_elo, opp_elo)
+    # Allow 1% tolerance for Monte Carlo variance. FAST_TESTS simulates fewer
+    # matches, so it allows 4 worst-case stddevs of sqrt(0.25 / n) instead
+    if FAST_TESTS:
+        iterations = 10000
+        tolerance = 4 * math.sqrt(0.25 / iterations)
+    else:
+        iterations = 50000
+        tolerance = 0.01
+
+    # Simulate all cases in one batch
+    team_elos, opp_elos, _ = zip(*test_cases)
+    counts = mc_counts(team_elos, opp_elos, iterations)
+
+    for (team_elo, opp_elo, desc), (wins, draws, losses) in zip(test_cases, counts.tolist()):
+        expected = _cached_probs(team_elo, opp_elo)
+
         actual_win = wins / iterations
         actual_draw = draws / iterations
         actual_loss = losses / iterations
 
-        # Allow 1% tolerance for Monte Carlo variance
-        tolerance = 0.01
         results.add(
-            f"MC {desc}: win prob within 1%",
-            abs(actual_win - expected['win']) < tolerance,
-            f"Expected {expected['win']:.4f}, got {actual_win:.4f}"
+            f"MC {desc}: win prob within {tolerance:.0%}",
+            abs(actual_win - expected.win) < tolerance,
+            lambda: f"Expected {expected.win:.4f}, got {actual_win:.4f}"
         )
         results.add(
-            f"MC {desc}: draw prob within 1%",
-            abs(actual_draw - expected['draw']) < tolerance,
-            f"Expected {expected['draw']:.4f}, got {actual_draw:.4f}"
+            f"MC {desc}: draw prob within {tolerance:.0%}",
+            abs(actual_draw - expected.draw) < tolerance,
+            lambda: f"Expected {expected.draw:.4f}, got {actual_draw:.4f}"
         )
         results.add(
-            f"MC {desc}: loss prob within 1%",
-            abs(actual_loss - expected['loss']) < tolerance,
-            f"Expected {expected['loss']:.4f}, got {actual_loss:.4f}"
+            f"MC {desc}: loss prob within {tolerance:.0%}",
+            abs(actual_loss - expected.loss) < tolerance,
+            lambda: f"Expected {expected.loss:.4f}, got {actual_loss:.4f}"
         )
 
 
@@ -347,8 +494,8 @@ def test_expected_points(results: TestResults):
 
     def expected_points(team_elo: float, opp_elo: float) -> float:
         """Calculate expected points from a match (3 for win, 1 for draw, 0 for loss)."""
-        probs = get_match_probabilities(team_elo, opp_elo)
-        return 3 * probs['win'] + 1 * probs['draw'] + 0 * probs['loss']
+        probs = _cached_probs(team_elo, opp_elo)
+        return 3 * probs.win + 1 * probs.draw + 0 * probs.loss
 
     # Test 1: Equal teams should expect ~1.365 points (0.365*3 + 0.27*1)
     points = expected_points(1600, 1600)
@@ -358,7 +505,7 @@ def test_expected_points(results: TestResults):
     results.add(
         "Equal teams: expected ~1.365 points",
         abs(points - expected) < 0.001,
-        f"Expected {expected:.4f}, got {points:.4f}"
+        lambda: f"Expected {expected:.4f}, got {points:.4f}"
     )
 
     # Test 2: Better team expects more points
@@ -367,41 +514,53 @@ def test_expected_points(results: TestResults):
     results.add(
         "Better team expects more points",
         points_better > points_worse,
-        f"Better: {points_better:.4f}, Worse: {points_worse:.4f}"
+        lambda: f"Better: {points_better:.4f}, Worse: {points_worse:.4f}"
     )
 
     # Test 3: Sum of expected points for both teams
     # Should equal 3 * P(win) + 3 * P(loss) + 2 * P(draw) = 3(1-draw) + 2*draw = 3 - draw
+    # Each side's points come from its own perspective's probabilities
     for diff in [0, 100, 200]:
-        pts1 = expected_points(1600 + diff, 1600)
-        pts2 = expected_points(1600, 1600 + diff)
-        probs = get_match_probabilities(1600 + diff, 1600)
-        expected_total = 3 - probs['draw']
+        probs = _cached_probs(1600 + diff, 1600)
+        probs_reversed = _cached_probs(1600, 1600 + diff)
+        pts1 = 3 * probs.win + probs.draw
+        pts2 = 3 * probs_reversed.win + probs_reversed.draw
+        expected_total = 3 - probs.draw
         results.add(
             f"Points sum ({diff} gap) = 3 - draw_prob",
             abs(pts1 + pts2 - expected_total) < 0.001,
-            f"Sum: {pts1 + pts2:.4f}, Expected: {expected_total:.4f}"
+            lambda: f"Sum: {pts1 + pts2:.4f}, Expected: {expected_total:.4f}"
         )
 
 
 def display_probability_table():
     """Display a table of probabilities for reference."""
-    print("\n" + "=" * 70)
-    print("WIN PROBABILITY REFERENCE TABLE")
-    print("=" * 70)
-    print(f"{'Elo Diff':<10} {'Win Exp':<12} {'Draw':<10} {'Win':<10} {'Loss':<10}")
-    print("-" * 70)
-
-    for diff in [0, 50, 100, 150, 200, 250, 300, 400, 500]:
-        probs = get_match_probabilities(1600 + diff, 1600)
-        print(f"{diff:<10} {probs['win_expectancy']:<12.4f} {probs['draw']:<10.4f} "
-              f"{probs['win']:<10.4f} {probs['loss']:<10.4f}")
+    lines = [
+        "",
+        "=" * 70,
+        "WIN PROBABILITY REFERENCE TABLE",
+        "=" * 70,
+        f"{'Elo Diff':<10} {'Win Exp':<12} {'Draw':<10} {'Win':<10} {'Loss':<10}",
+        "-" * 70,
+    ]
 
-    print("=" * 70)
-    print("\nNotes:")
-    print("- 'Win Exp' is raw Elo expectancy before draw adjustment")
-    print("- Draw probability: max(0.15, 0.27 - diff * 0.0004)")
-    print("- Win/Loss redistribute the remaining probability")
+    # Evaluate every row of the table in one vectorized call
+    diffs = np.array([0, 50, 100, 150, 200, 250, 300, 400, 500])
+    win, draw, loss, win_exp = get_match_probabilities_vec(diffs, 0)
+
+    for diff, row_win_exp, row_draw, row_win, row_loss in zip(diffs.tolist(), win_exp, draw, win, loss):
+        lines.append(f"{diff:<10} {row_win_exp:<12.4f} {row_draw:<10.4f} "
+                     f"{row_win:<10.4f} {row_loss:<10.4f}")
+
+    lines += [
+        "=" * 70,
+        "",
+        "Notes:",
+        "- 'Win Exp' is raw Elo expectancy before draw adjustment",
+        "- Draw probability: max(0.15, 0.27 - diff * 0.0004)",
+        "- Win/Loss redistribute the remaining probability",
+    ]
+    sys.stdout.write("\n".join(lines) + "\n")
 
 
 def main():